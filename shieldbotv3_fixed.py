@@ -31,13 +31,22 @@ Run: set DISCORD_TOKEN and (optionally) GUILD_ID, then run this file with Python
 """
 
 import os
+import re
 import json
 import time
+import atexit
+import sys
 import asyncio
+import functools
 import logging
 import random
+from collections import deque
 from datetime import datetime, timedelta, timezone
+from heapq import nlargest
+from itertools import islice
+from operator import attrgetter
 
+import aiohttp
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
@@ -49,17 +58,30 @@ except ImportError:
     HAS_PSUTIL = False
 
 try:
-    from openai import OpenAI
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from openai import AsyncOpenAI
     HAS_OPENAI = True
-    OPENAI_CLIENT = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 except ImportError:
     HAS_OPENAI = False
 
+try:
+    import uvloop  # not available on Windows
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
 
 # ---------- Configuration & paths ----------
 BASE_DIR = os.path.dirname(__file__)
 DATA_DIR = os.path.join(BASE_DIR, "data")
 os.makedirs(DATA_DIR, exist_ok=True)
+MODLOG_DIR = os.path.join(DATA_DIR, "logs")  # per-guild append-only moderation logs
+os.makedirs(MODLOG_DIR, exist_ok=True)
 WARNS_PATH = os.path.join(DATA_DIR, "warns.json")
 BIRTHDAYS_PATH = os.path.join(DATA_DIR, "birthdays.json")
 AUTOREACT_PATH = os.path.join(DATA_DIR, "autoreact.json")
@@ -78,6 +100,12 @@ APPLICATIONS_PATH = os.path.join(DATA_DIR, "applications.json")
 
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 TEST_GUILD_ID = os.getenv("GUILD_ID")  # optional to speed command registration
+DEBUG_JSON = bool(os.getenv("DEBUG_JSON"))  # pretty-print data files for manual inspection
+
+# Server-specific ids
+OWNER_ID = 1436351143516311622
+GTO_ID = 1177669170981253132  # bot maker
+SUPPORT_ROLE_ID = 1441334848878022656
 
 
 # ---------- Logging ----------
@@ -88,25 +116,366 @@ handler.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s
 logger.addHandler(handler)
 
 
+# ---------- Small helpers ----------
+_UTC = timezone.utc
+_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})", re.ASCII)
+_SANITIZE_RE = re.compile(r"[^a-z0-9-]", re.I | re.ASCII)
+
+
+def _now_iso() -> str:
+    # Timezone-aware and second precision keeps stored timestamps short
+    return datetime.now(_UTC).isoformat(timespec="seconds")
+
+
+@functools.lru_cache(maxsize=4096)
+def _sid(snowflake: int) -> str:
+    """Interned string form of a Discord id, used for JSON store keys."""
+    return sys.intern(str(snowflake))
+
+
+@functools.cache
+def _openai():
+    # Built on first AI reply rather than at import so bots without AI never pay for the client
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+def _safe_channel_fragment(name: str) -> str:
+    """First 10 chars of ``name`` with anything Discord won't keep in a channel name replaced by '-'."""
+    return _SANITIZE_RE.sub("-", name[:10]).lower()
+
+
+def _outranks(invoker: discord.Member, target: discord.Member) -> bool:
+    """Whether ``invoker`` may moderate ``target`` (admins bypass the role hierarchy)."""
+    return invoker.guild_permissions.administrator or target.top_role.position < invoker.top_role.position
+
+
 # ---------- Helpers for JSON persistence ----------
+# orjson is used when installed; the stdlib fallback produces the same files.
+# Snapshots are written compact unless DEBUG_JSON is set.
+if HAS_ORJSON:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if DEBUG_JSON else 0)
+
+    def _dumps(data) -> bytes:
+        return orjson.dumps(data, option=_ORJSON_OPTS)
+
+    def _dumps_line(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+    _loads = orjson.loads
+else:
+    def _dumps(data) -> bytes:
+        if DEBUG_JSON:
+            return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _dumps_line(data) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _loads = json.loads
+
+
 def load_json(path, default=None):
     if default is None:
         default = {}
     try:
         if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(path, "rb") as f:
+                return _loads(f.read())
     except Exception:
         logger.exception("Failed to load %s", path)
     return default
 
 
+# Writes are debounced: save_json only marks a path dirty and the flusher task
+# coalesces everything marked within FLUSH_DELAY into one write per file.
+# Journals (see JsonlLog) queue themselves the same way to get their buffer flushed.
+FLUSH_DELAY = 1.0
+_dirty = {}  # path -> data to persist, or the JsonlLog to flush, on the next flush
+_flush_event = asyncio.Event()
+_flusher_task = None
+
+
+def _atomic_write(path, payload: bytes):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
 def save_json(path, data):
-    try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except Exception:
-        logger.exception("Failed to save %s", path)
+    _dirty[path] = data
+    _flush_event.set()
+
+
+async def _flusher():
+    while True:
+        await _flush_event.wait()
+        await asyncio.sleep(FLUSH_DELAY)
+        _flush_event.clear()
+        # Take one path at a time so whatever isn't written yet stays in _dirty for flush_json
+        while _dirty:
+            path = next(iter(_dirty))
+            data = _dirty.pop(path)
+            try:
+                if isinstance(data, JsonlLog):
+                    write = asyncio.ensure_future(asyncio.to_thread(*data.take_job()))
+                else:
+                    # Serialize on the loop so the dict can't change mid-dump, then
+                    # hand the blocking write off to a worker thread.
+                    payload = _dumps(data)
+                    write = asyncio.ensure_future(asyncio.to_thread(_atomic_write, path, payload))
+                try:
+                    await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    # Let the in-flight write land before shutdown flushes the rest
+                    await asyncio.gather(write, return_exceptions=True)
+                    raise
+            except Exception:
+                logger.exception("Failed to save %s", path)
+                if isinstance(data, JsonlLog):
+                    data.job_failed()
+
+
+def flush_json():
+    """Synchronously write everything still pending (used on shutdown)."""
+    pending = _dirty.copy()
+    _dirty.clear()
+    for path, data in pending.items():
+        try:
+            if isinstance(data, JsonlLog):
+                job, payload = data.take_job()
+                job(payload)
+            else:
+                _atomic_write(path, _dumps(data))
+        except Exception:
+            logger.exception("Failed to save %s", path)
+            if isinstance(data, JsonlLog):
+                data.job_failed()
+
+
+async def close_json():
+    """Stop the flusher, waiting out any write in progress, then write what is left."""
+    if _flusher_task is not None:
+        _flusher_task.cancel()
+        await asyncio.gather(_flusher_task, return_exceptions=True)
+    flush_json()
+
+
+atexit.register(flush_json)
+
+
+# ---------- Append-only journals ----------
+# High-churn stores (warns, AI conversation memory) append one JSON line per
+# mutation instead of rewriting the whole snapshot. The log is replayed on top
+# of the snapshot at startup and folded back into it by compaction. All file I/O
+# (appends and compaction) runs as jobs of the module flusher, one at a time and
+# off the event loop.
+WAL_COMPACT_MINUTES = 5
+WAL_COMPACT_BYTES = 1 << 20
+WAL_COMPACT_RECORDS = 500
+# Every record carries a sequence number "n" and each snapshot stores the last one it
+# includes under this key, so replay skips records a snapshot already covers (a crash
+# between writing the snapshot and truncating the log must not apply them twice).
+JOURNAL_SEQ_KEY = "_seq"
+
+
+class JsonlLog:
+    def __init__(self, snapshot_path, snapshot):
+        self.snapshot_path = snapshot_path
+        self.path = snapshot_path + ".log"
+        self.snapshot = snapshot  # returns the data a compaction writes to snapshot_path
+        self._pending = []  # encoded records not yet written to the log
+        self._compact_requested = False
+        self._in_flight = None  # what the running job took, restored by job_failed()
+        self.records = 0  # appended since the last compaction
+        self.bytes = 0  # size of the log, including pending records
+        self.seq = 0  # sequence number of the last record appended or replayed
+
+    def replay(self, snapshot_seq=0):
+        """Records not yet in the snapshot taken at ``snapshot_seq``, in append order."""
+        records = []
+        self.seq = snapshot_seq
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        rec = _loads(line)
+                    except ValueError:
+                        # A torn trailing line from a crash; everything before it is intact
+                        logger.warning("Skipping corrupt record in %s", self.path)
+                        continue
+                    n = rec.get("n")
+                    # Logs from before sequence numbers have none; anything at or below the
+                    # running seq is in the snapshot or a retried duplicate of a failed write
+                    if n is None or n > self.seq:
+                        records.append(rec)
+                        self.seq = max(self.seq, n or 0)
+                self.bytes = f.tell()
+        except FileNotFoundError:
+            pass
+        except Exception:
+            logger.exception("Failed to replay %s", self.path)
+        self.records = len(records)
+        return records
+
+    def append(self, record):
+        self.seq += 1
+        record["n"] = self.seq
+        line = _dumps_line(record) + b"\n"
+        self._pending.append(line)
+        self.records += 1
+        self.bytes += len(line)
+        if self.records >= WAL_COMPACT_RECORDS or self.bytes > WAL_COMPACT_BYTES:
+            self._compact_requested = True
+        self._schedule()
+
+    def compact(self):
+        """Queue a rewrite of the snapshot that empties the log."""
+        if self.bytes:
+            self._compact_requested = True
+            self._schedule()
+
+    def _schedule(self):
+        _dirty[self.path] = self
+        _flush_event.set()
+
+    def take_job(self):
+        """Called on the loop by the flusher: returns ``(func, payload)`` to run in a worker thread."""
+        if self._compact_requested:
+            # The snapshot already contains every pending record, so they are dropped
+            self._compact_requested = False
+            self._in_flight = (self._pending, self.records, self.bytes, True)
+            self._pending = []
+            self.records = 0
+            self.bytes = 0
+            return self._rewrite, _dumps({**self.snapshot(), JOURNAL_SEQ_KEY: self.seq})
+        self._in_flight = (self._pending, 0, 0, False)
+        chunk = b"".join(self._pending)
+        self._pending = []
+        return self._write, chunk
+
+    def job_failed(self):
+        """Called on the loop when the last job raised: put back what it took."""
+        lines, records, size, compaction = self._in_flight
+        self._in_flight = None
+        self._pending[:0] = lines
+        self.records += records
+        self.bytes += size
+        if compaction:
+            # Retried with the next append rather than immediately, so a full disk isn't hammered
+            self._compact_requested = True
+
+    def _write(self, chunk: bytes):
+        with open(self.path, "ab") as f:
+            f.write(chunk)
+
+    def _rewrite(self, payload: bytes):
+        # Snapshot first: if we crash before truncating, replay skips the covered records by seq
+        _atomic_write(self.snapshot_path, payload)
+        with open(self.path, "wb"):
+            pass
+
+
+# ---------- Static embed content ----------
+# Built once at import; commands create their Embed from these per call.
+TICKET_EMBED_DICT = {
+    "title": "🎫 Support Ticket System",
+    "description": "Need help? Create a support ticket by clicking one of the buttons below.\nEach ticket is private and only visible to you and our support team.",
+    "color": discord.Color.blue().value,
+    "fields": [
+        {"name": "🔧 Technical Support", "value": "Report server bugs, connection issues, or technical problems", "inline": False},
+        {"name": "🚨 Report", "value": "Report rule violations, harassment, or inappropriate behavior", "inline": False},
+        {"name": "❓ General Inquiry", "value": "Ask questions about the server, rules, or other topics", "inline": False},
+        {"name": "👔 Staff Apply", "value": "Apply to become a staff member - Answer comprehensive questions about your experience, moderation style, and commitment", "inline": False},
+        {"name": "📋 How It Works", "value": "Click a button → Private channel created → Only you and admins see it", "inline": False},
+    ],
+    "footer": {"text": "Click the button that matches your need"},
+}
+
+# on_member_join copies this and fills in the member-specific parts
+_WELCOME_EMBED_TEMPLATE = discord.Embed(title="Welcome!", color=discord.Color.green())
+
+ANTIRAID_ACTION_EMOJI = {"ban": "🔨", "kick": "👢", "mute": "🔇", "warn": "⚠️"}
+
+_role_position = attrgetter("position")
+
+# Mod-log embed styling: first keyword found in the lowercased message wins, so
+# "unbanned"/"unmuted" must come before "banned"/"muted".
+MODLOG_RULES = (
+    ("kicked", (discord.Color.orange(), "👢 KICK")),
+    ("unbanned", (discord.Color.green(), "✅ UNBAN")),
+    ("banned", (discord.Color.red(), "🔨 BAN")),
+    ("unmuted", (discord.Color.green(), "🔊 UNMUTE")),
+    ("muted", (discord.Color.gold(), "🔇 MUTE")),
+    ("timeout", (discord.Color.gold(), "🔇 MUTE")),
+    ("removed all warns", (discord.Color.green(), "✅ WARN CLEARED")),
+    ("purged", (discord.Color.purple(), "🧹 PURGE")),
+)
+_MODLOG_DEFAULT = (discord.Color.greyple(), "📋 ACTION")
+
+# AI personality instructions, selected with /setpersonality
+PERSONALITY_MAP = {
+    "brutal": "Be extremely harsh, aggressive, and savage in your responses. Insult people's ideas bluntly.",
+    "professional": "Be formal, professional, and courteous. Provide helpful and structured responses.",
+    "savage": "Be witty, sarcastic, and roastingly funny. Don't hold back on the jokes.",
+    "friendly": "Be warm, welcoming, and supportive. Show genuine interest in helping.",
+    "sarcastic": "Use heavy sarcasm and irony. Make jokes at people's expense in a funny way.",
+    "dark": "Use dark humor and edgy jokes. Reference morbid topics while keeping it funny."
+}
+_PERSONALITY_BRUTAL = PERSONALITY_MAP["brutal"]
+
+# System prompt wrapped around the persona instruction
+_SYS_PREFIX = "You are Cabbit, a Discord bot. "
+_SYS_SUFFIX = " Keep responses under 150 words."
+
+# Owner and gto: the AI is always respectful to them
+RESPECTED_USER_IDS = frozenset({OWNER_ID, GTO_ID})
+
+
+# ---------- Staff application questions ----------
+STAFF_QUESTIONS = [
+    "**Q1:** What is your Discord username + tag?",
+    "**Q2:** What is your age?",
+    "**Q3:** What country/timezone are you in?",
+    "**Q4:** How active are you daily? (Hours)",
+    "**Q5:** How long have you been in the server?",
+    "**Q6:** Why do you want to become staff here?",
+    "**Q7:** What do you like the most about our server?",
+    "**Q8:** Do you have any previous moderation experience? If yes, explain.",
+    "**Q9:** What skills or strengths make you a good staff member?",
+    "**Q10:** What are your weaknesses as a staff member? (good question to see honesty)",
+    "**Q11:** A member is spamming but not breaking major rules — what do you do?",
+    "**Q12:** Two members start arguing and it becomes toxic — how do you handle it?",
+    "**Q13:** Your friend breaks a rule — what would you do?",
+    "**Q14:** A user reports harassment but provides no evidence — what's your action?",
+    "**Q15:** Someone accuses staff of abuse — how do you handle the situation?",
+    "**Q16:** How do you react to pressure or stressful situations?",
+    "**Q17:** How would you describe your moderation style? (strict, calm, neutral, etc.)",
+    "**Q18:** Are you able to work as a team and accept feedback/criticism?",
+    "**Q19:** What motivates you to stay active as staff?",
+    "**Q20:** Can you stay unbiased, even with friends or drama?",
+    "**Q21:** How long do you plan to stay as a staff member?",
+    "**Q22:** Are you willing to learn the rules and follow all staff guidelines?",
+    "**Q23:** Why should we pick YOU over other applicants? (This reveals confidence and personality)"
+]
+
+
+def _chunk_lines(lines, limit=1900):
+    """Join lines into as few messages as possible, each under Discord's 2000-char limit."""
+    chunks, current = [], ""
+    for line in lines:
+        if current and len(current) + 1 + len(line) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+STAFF_QUESTIONS_MESSAGES = _chunk_lines(STAFF_QUESTIONS)
+STAFF_APPLICATION_PING = f"<@{OWNER_ID}> <@{GTO_ID}> - New staff application!"
 
 
 # ---------- Bot setup ----------
@@ -116,46 +485,197 @@ intents.message_content = True
 
 bot = commands.Bot(command_prefix="!", intents=intents)
 bot.remove_command('help')
+CABBIT = None  # the Cabbit cog, set in setup_hook; used by the module-level event handlers
+
+
+# ---------- AI conversation memory ----------
+CONV_MAX_MESSAGES = 10
+CONV_MAX_CHARS = 2000  # bounds the prompt sent to OpenAI regardless of message sizes
+
+
+def _new_conversation(entries=()) -> deque:
+    # maxlen enforces the message cap on append
+    return deque(entries, maxlen=CONV_MAX_MESSAGES)
+
+
+def _trim_conversation(conversation: deque):
+    """Drop the oldest entries until the character cap holds (the newest is always kept)."""
+    total = sum(len(m["message"]) for m in conversation)
+    while len(conversation) > 1 and total > CONV_MAX_CHARS:
+        total -= len(conversation.popleft()["message"])
+
+
+# ---------- Anti-raid actions ----------
+# Called as handler(cog, member, config, guild_id) when a member trips the spam threshold
+async def _antiraid_ban(cog, member: discord.Member, config: dict, guild_id: str):
+    await member.ban(reason="Anti-raid ban")
+
+
+async def _antiraid_kick(cog, member: discord.Member, config: dict, guild_id: str):
+    await member.kick(reason="Anti-raid kick")
+
+
+async def _antiraid_mute(cog, member: discord.Member, config: dict, guild_id: str):
+    until = datetime.now(_UTC) + timedelta(minutes=config.get("mute_duration", 30))
+    await member.timeout(until, reason="Anti-raid mute")
+
+
+async def _antiraid_warn(cog, member: discord.Member, config: dict, guild_id: str):
+    cog._log_warn({
+        "g": guild_id,
+        "u": _sid(member.id),
+        "moderator": "Anti-raid system",
+        "reason": "Spam detected",
+        "time": _now_iso()
+    })
+
+
+ANTIRAID_ACTIONS = {
+    "ban": _antiraid_ban,
+    "kick": _antiraid_kick,
+    "mute": _antiraid_mute,
+    "warn": _antiraid_warn,
+}
 
 
 class Cabbit(commands.Cog):
+    # Persistent stores loaded in cog_load: (attribute, snapshot path, default)
+    STORES = (
+        ("warns", WARNS_PATH, {}),
+        ("birthdays", BIRTHDAYS_PATH, {}),
+        ("autoreact", AUTOREACT_PATH, {}),
+        ("mutes", MUTES_PATH, {}),
+        ("antiraid", ANTIRAID_PATH, {}),
+        ("modlog", MODLOG_PATH, {}),
+        ("ticket_channels", TICKETS_PATH, {}),
+        ("welcome_channels", WELCOME_PATH, {}),
+        ("ai_enabled", AI_ENABLED_PATH, {}),
+        ("vc_interface", VC_INTERFACE_PATH, {}),
+        ("vc_menu", VC_MENU_PATH, {}),
+        ("afk", AFK_PATH, {}),  # guild_id -> {user_id: "reason"}
+        ("conv_memory", CONV_MEMORY_PATH, {}),  # channel_id -> deque([{"author": name, "message": text}, ...])
+        ("personality", PERSONALITY_PATH, {"global": "brutal"}),  # global personality setting
+        ("applications", APPLICATIONS_PATH, {}),  # guild_id -> {"status": "open"/"closed", "responses": {user_id: [answers]}}
+    )
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.warns = load_json(WARNS_PATH, {})
-        self.birthdays = load_json(BIRTHDAYS_PATH, {})
-        self.autoreact = load_json(AUTOREACT_PATH, {})
-        self.mutes = load_json(MUTES_PATH, {})
-        self.antiraid = load_json(ANTIRAID_PATH, {})
-        self.modlog = load_json(MODLOG_PATH, {})
-        self.ticket_channels = load_json(TICKETS_PATH, {})
-        self.welcome_channels = load_json(WELCOME_PATH, {})
-        self.ai_enabled = load_json(AI_ENABLED_PATH, {})
-        self.vc_interface = load_json(VC_INTERFACE_PATH, {})
-        self.vc_menu = load_json(VC_MENU_PATH, {})
-        self.afk = load_json(AFK_PATH, {})  # guild_id -> {user_id: "reason"}
-        self.conv_memory = load_json(CONV_MEMORY_PATH, {})  # channel_id -> [{"author": name, "message": text}, ...]
-        self.personality = load_json(PERSONALITY_PATH, {"global": "brutal"})  # global personality setting
-        self.applications = load_json(APPLICATIONS_PATH, {})  # guild_id -> {"status": "open"/"closed", "responses": {user_id: [answers]}}
         self.vc_owners = {}  # vc_id -> (owner_id, text_ch_id, guild_id)
-        # runtime activity tracking: guild_id -> {user_id: [timestamps]}
+        # runtime activity tracking: (guild.id, user.id) -> deque of timestamps (maxlen = threshold)
         self.msg_activity = {}
         self.mute_escalation = {}  # guild_id -> {user_id: mute_count} for antiraid escalation
         self.warn_counts = {}  # guild_id -> {user_id: warn_count} for antiraid warns
-        self.startup_time = datetime.now(timezone.utc)
+        self.startup_time = datetime.now(_UTC)
+        self._modlog_fhs = {}  # guild_id -> buffered append handle for logs/{guild_id}.log
+        self._general_ch = {}  # guild.id -> id of its #general channel (birthday announcements)
+        self._modlog_channel_cache = {}  # guild.id -> resolved mod-log TextChannel
+        self._modlog_footer_cache = {}  # guild.id -> "Guild: <name>" footer text
+        self._welcome_channel_cache = {}  # guild.id -> resolved welcome TextChannel
+        self._pending_deletes = {}  # ticket channel id -> TimerHandle for its delayed deletion
+        self._bg_tasks = set()  # strong refs to fire-and-forget tasks until they finish
+
+    async def cog_load(self):
+        # setup_hook runs after login, so the bot user is already known here
+        self._bot_id = self.bot.user.id
+        await self._load_all()
         self.birthday_task.start()
+        self.wal_compact_task.start()
+        self.modlog_flush_task.start()
+
+    async def _load_all(self):
+        # Read every snapshot concurrently so startup costs the slowest file, not the sum
+        loaded = await asyncio.gather(*[
+            asyncio.to_thread(load_json, path, dict(default)) for _, path, default in self.STORES
+        ])
+        for (attr, _, _), data in zip(self.STORES, loaded):
+            setattr(self, attr, data)
+        warns_seq = self.warns.pop(JOURNAL_SEQ_KEY, 0)
+        conv_seq = self.conv_memory.pop(JOURNAL_SEQ_KEY, 0)
+        self.conv_memory = {k: _new_conversation(v) for k, v in self.conv_memory.items()}
+        self.modlog = {k: int(v) for k, v in self.modlog.items()}  # older files store channel ids as strings
+        # Read on every join/voice event, so keyed and valued by int ids (JSON keeps strings)
+        self.welcome_channels = {int(k): int(v) for k, v in self.welcome_channels.items()}
+        self.vc_interface = {int(k): int(v) for k, v in self.vc_interface.items()}
+        self._rebuild_antiraid_index()
+
+        self._wal_warns = JsonlLog(WARNS_PATH, lambda: self.warns)
+        self._wal_conv = JsonlLog(CONV_MEMORY_PATH, self._conv_snapshot)
+        warn_records, conv_records = await asyncio.gather(
+            asyncio.to_thread(self._wal_warns.replay, warns_seq),
+            asyncio.to_thread(self._wal_conv.replay, conv_seq),
+        )
+        for rec in warn_records:
+            self._apply_warn_record(rec)
+        for rec in conv_records:
+            self._apply_conv_record(rec)
+
+        # (guild_id, "MM-DD") -> [int user_id, ...] so the birthday task only visits today's
+        # birthdays and can hand ids straight to get_member
+        self._birthday_index = {}
+        for guild_id, users in self.birthdays.items():
+            for user_id, birthday_str in users.items():
+                self._birthday_index.setdefault((guild_id, birthday_str[5:]), []).append(int(user_id))
+
+    def _rebuild_antiraid_index(self):
+        # on_message checks this set instead of probing each guild's config
+        self._antiraid_enabled = frozenset(g for g, cfg in self.antiraid.items() if cfg.get("enabled"))
 
     def cog_unload(self):
         self.birthday_task.cancel()
+        self.wal_compact_task.cancel()
+        # Leave clean snapshots behind so the next start has nothing to replay;
+        # close_json() writes them once the bot has closed
+        self._wal_warns.compact()
+        self._wal_conv.compact()
+        self.modlog_flush_task.cancel()
+        for timer in self._pending_deletes.values():
+            timer.cancel()
+        self._pending_deletes.clear()
+        for fh in self._modlog_fhs.values():
+            fh.close()
+        self._modlog_fhs.clear()
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+        return task
+
+    # ---------- Journal helpers ----------
+    def _apply_warn_record(self, rec):
+        g = self.warns.setdefault(rec["g"], {})
+        if rec.get("op") == "clear":
+            g.pop(rec["u"], None)
+            return
+        g.setdefault(rec["u"], []).append({k: rec[k] for k in ("moderator", "reason", "time")})
+
+    def _apply_conv_record(self, rec):
+        conversation = self.conv_memory.get(rec["c"])
+        if conversation is None:
+            conversation = self.conv_memory[rec["c"]] = _new_conversation()
+        conversation.append({"author": rec["author"], "message": rec["message"]})
+        _trim_conversation(conversation)
+
+    def _log_warn(self, rec):
+        self._apply_warn_record(rec)
+        self._wal_warns.append(rec)
+
+    def _conv_snapshot(self):
+        # deques aren't JSON-serializable
+        return {k: list(v) for k, v in self.conv_memory.items()}
+
+    def _log_conv(self, rec):
+        self._wal_conv.append(rec)
 
     # ---------- Moderation commands (slash) ----------
     @app_commands.command(name="kick", description="Kick a member from the server")
+    @app_commands.default_permissions(kick_members=True)
     @app_commands.checks.has_permissions(kick_members=True)
     async def kick(self, interaction: discord.Interaction, member: discord.Member, reason: str = ""):
-        await interaction.response.defer()
-        # Check if invoker has higher rank than target
-        if member.top_role.position >= interaction.user.top_role.position and not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send(f"❌ You cannot kick {member.mention} - they have an equal or higher rank!")
+        if not _outranks(interaction.user, member):
+            await interaction.response.send_message(f"❌ You cannot kick {member.mention} - they have an equal or higher rank!")
             return
+        await interaction.response.defer()
         try:
             await member.kick(reason=reason)
             await interaction.followup.send(f"Kicked {member.mention}. Reason: {reason}")
@@ -163,13 +683,13 @@ class Cabbit(commands.Cog):
             await interaction.followup.send(f"Failed to kick: {e}")
 
     @app_commands.command(name="ban", description="Ban a member from the server")
+    @app_commands.default_permissions(ban_members=True)
     @app_commands.checks.has_permissions(ban_members=True)
     async def ban(self, interaction: discord.Interaction, member: discord.Member, reason: str = "", days: int = 0):
-        await interaction.response.defer()
-        # Check if invoker has higher rank than target
-        if member.top_role.position >= interaction.user.top_role.position and not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send(f"❌ You cannot ban {member.mention} - they have an equal or higher rank!")
+        if not _outranks(interaction.user, member):
+            await interaction.response.send_message(f"❌ You cannot ban {member.mention} - they have an equal or higher rank!")
             return
+        await interaction.response.defer()
         try:
             await member.ban(reason=reason, delete_message_days=max(0, min(7, days)))
             await interaction.followup.send(f"Banned {member.mention}. Reason: {reason}")
@@ -177,36 +697,32 @@ class Cabbit(commands.Cog):
             await interaction.followup.send(f"Failed to ban: {e}")
 
     @app_commands.command(name="warn", description="Warn a member (persistent)")
+    @app_commands.default_permissions(kick_members=True)
     @app_commands.checks.has_permissions(kick_members=True)
     async def warn(self, interaction: discord.Interaction, member: discord.Member, *, reason: str = ""):
-        await interaction.response.defer()
-        # Check if invoker has higher rank than target
-        if member.top_role.position >= interaction.user.top_role.position and not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send(f"❌ You cannot warn {member.mention} - they have an equal or higher rank!")
+        if not _outranks(interaction.user, member):
+            await interaction.response.send_message(f"❌ You cannot warn {member.mention} - they have an equal or higher rank!")
             return
-        guild_id = str(interaction.guild_id)
-        g = self.warns.setdefault(guild_id, {})
-        m = g.setdefault(str(member.id), [])
-        entry = {"moderator": str(interaction.user.id), "reason": reason, "time": datetime.utcnow().isoformat()}
-        m.append(entry)
-        save_json(WARNS_PATH, self.warns)
-        await interaction.followup.send(f"Warned {member.mention}. Reason: {reason}")
+        guild_id = _sid(interaction.guild_id)
+        entry = {"moderator": _sid(interaction.user.id), "reason": reason, "time": _now_iso()}
+        self._log_warn({"g": guild_id, "u": _sid(member.id), **entry})
+        await interaction.response.send_message(f"Warned {member.mention}. Reason: {reason}")
 
     @app_commands.command(name="mute", description="Timeout (mute) a member for a duration in minutes")
+    @app_commands.default_permissions(moderate_members=True)
     @app_commands.checks.has_permissions(moderate_members=True)
     async def mute(self, interaction: discord.Interaction, member: discord.Member, minutes: int = 10, *, reason: str = ""):
-        await interaction.response.defer()
-        # Check if invoker has higher rank than target
-        if member.top_role.position >= interaction.user.top_role.position and not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send(f"❌ You cannot mute {member.mention} - they have an equal or higher rank!")
+        if not _outranks(interaction.user, member):
+            await interaction.response.send_message(f"❌ You cannot mute {member.mention} - they have an equal or higher rank!")
             return
-        until = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+        await interaction.response.defer()
+        until = datetime.now(_UTC) + timedelta(minutes=minutes)
         try:
             await member.timeout(until, reason=reason)
             # Persist mute record
-            guild_id = str(interaction.guild_id)
+            guild_id = _sid(interaction.guild_id)
             g = self.mutes.setdefault(guild_id, {})
-            g[str(member.id)] = {"until": until.isoformat(), "moderator": str(interaction.user.id), "reason": reason}
+            g[_sid(member.id)] = {"until": until.isoformat(), "moderator": _sid(interaction.user.id), "reason": reason}
             save_json(MUTES_PATH, self.mutes)
             await interaction.followup.send(f"🔇 Muted {member.mention} for {minutes} minutes. Reason: {reason}")
             await self._send_modlog(interaction.guild, f"{interaction.user} muted {member} ({member.id}) for {minutes} minutes. Reason: {reason}")
@@ -214,18 +730,18 @@ class Cabbit(commands.Cog):
             await interaction.followup.send(f"Failed to mute: {e}")
 
     @app_commands.command(name="unmute", description="Remove timeout (unmute) from a member")
+    @app_commands.default_permissions(moderate_members=True)
     @app_commands.checks.has_permissions(moderate_members=True)
     async def unmute(self, interaction: discord.Interaction, member: discord.Member, *, reason: str = ""):
-        await interaction.response.defer()
-        # Check if invoker has higher rank than target
-        if member.top_role.position >= interaction.user.top_role.position and not interaction.user.guild_permissions.administrator:
-            await interaction.followup.send(f"❌ You cannot unmute {member.mention} - they have an equal or higher rank!")
+        if not _outranks(interaction.user, member):
+            await interaction.response.send_message(f"❌ You cannot unmute {member.mention} - they have an equal or higher rank!")
             return
+        await interaction.response.defer()
         try:
             await member.timeout(None, reason=reason)
-            guild_id = str(interaction.guild_id)
-            if guild_id in self.mutes and str(member.id) in self.mutes[guild_id]:
-                del self.mutes[guild_id][str(member.id)]
+            guild_id = _sid(interaction.guild_id)
+            if guild_id in self.mutes and _sid(member.id) in self.mutes[guild_id]:
+                del self.mutes[guild_id][_sid(member.id)]
                 save_json(MUTES_PATH, self.mutes)
             await interaction.followup.send(f"✅ Unmuted {member.mention}. Reason: {reason}")
             await self._send_modlog(interaction.guild, f"{interaction.user} unmuted {member} ({member.id}). Reason: {reason}")
@@ -235,8 +751,8 @@ class Cabbit(commands.Cog):
     @app_commands.command(name="warncheck", description="Check how many warns a member has")
     async def warncheck(self, interaction: discord.Interaction, member: discord.Member):
         await interaction.response.defer()
-        guild_id = str(interaction.guild_id)
-        warns = self.warns.get(guild_id, {}).get(str(member.id), [])
+        guild_id = _sid(interaction.guild_id)
+        warns = self.warns.get(guild_id, {}).get(_sid(member.id), [])
 
         embed = discord.Embed(
             title=f"⚠️ Warn Record for {member.display_name}",
@@ -247,12 +763,11 @@ class Cabbit(commands.Cog):
         embed.add_field(name="Status", value="🟢 No warnings" if not warns else f"🔴 {len(warns)} warning{'s' if len(warns) != 1 else ''}", inline=True)
 
         if warns:
-            warn_text = ""
-            for i, warn in enumerate(warns, 1):
-                mod_id = warn.get("moderator", "Unknown")
-                reason = warn.get("reason", "No reason provided")
-                time_str = warn.get("time", "Unknown time")
-                warn_text += f"**#{i}** • {reason}\n   *Warned by: <@{mod_id}> on {time_str[:10]}*\n\n"
+            warn_text = "\n\n".join(
+                f"**#{i}** • {warn.get('reason', 'No reason provided')}\n"
+                f"   *Warned by: <@{warn.get('moderator', 'Unknown')}> on {warn.get('time', 'Unknown time')[:10]}*"
+                for i, warn in enumerate(warns, 1)
+            )
             embed.add_field(name="Warning History", value=warn_text, inline=False)
 
         embed.set_thumbnail(url=member.display_avatar.url)
@@ -260,6 +775,7 @@ class Cabbit(commands.Cog):
         await interaction.followup.send(embed=embed)
 
     @app_commands.command(name="unban", description="Unban a member from the server")
+    @app_commands.default_permissions(ban_members=True)
     @app_commands.checks.has_permissions(ban_members=True)
     async def unban(self, interaction: discord.Interaction, user: discord.User, *, reason: str = ""):
         await interaction.response.defer()
@@ -271,32 +787,42 @@ class Cabbit(commands.Cog):
             await interaction.followup.send(f"Failed to unban: {e}")
 
     @app_commands.command(name="removewarn", description="Remove all warns from a member")
+    @app_commands.default_permissions(kick_members=True)
     @app_commands.checks.has_permissions(kick_members=True)
     async def removewarn(self, interaction: discord.Interaction, member: discord.Member):
-        await interaction.response.defer()
-        guild_id = str(interaction.guild_id)
-        if guild_id in self.warns and str(member.id) in self.warns[guild_id]:
-            del self.warns[guild_id][str(member.id)]
-            save_json(WARNS_PATH, self.warns)
-            await interaction.followup.send(f"✅ Removed all warns from {member.mention}")
+        guild_id = _sid(interaction.guild_id)
+        if guild_id in self.warns and _sid(member.id) in self.warns[guild_id]:
+            self._log_warn({"op": "clear", "g": guild_id, "u": _sid(member.id)})
+            await interaction.response.send_message(f"✅ Removed all warns from {member.mention}")
             await self._send_modlog(interaction.guild, f"{interaction.user} removed all warns from {member} ({member.id})")
         else:
-            await interaction.followup.send(f"No warns found for {member.mention}")
+            await interaction.response.send_message(f"No warns found for {member.mention}")
 
     # ---------- Utility commands ----------
     @app_commands.command(name="setbirthday", description="Set your birthday (YYYY-MM-DD)")
     async def setbirthday(self, interaction: discord.Interaction, date: str):
-        await interaction.response.defer()
+        # Zero-padded only: the birthday task matches on date[5:] as "MM-DD", so
+        # "2000-1-5" (which strptime used to accept) would never fire
+        match = _DATE_RE.fullmatch(date)
         try:
-            dt = datetime.strptime(date, "%Y-%m-%d").date()
+            if not match:
+                raise ValueError(date)
+            datetime(*map(int, match.groups()))
         except ValueError:
-            await interaction.followup.send("Invalid date format. Use YYYY-MM-DD.")
+            await interaction.response.send_message("Invalid date format. Use YYYY-MM-DD, e.g. 2000-01-05.")
             return
-        guild_id = str(interaction.guild_id)
+        guild_id = _sid(interaction.guild_id)
+        user_id = _sid(interaction.user.id)
         g = self.birthdays.setdefault(guild_id, {})
-        g[str(interaction.user.id)] = date
+        old = g.get(user_id)
+        if old is not None:
+            bucket = self._birthday_index.get((guild_id, old[5:]), [])
+            if interaction.user.id in bucket:
+                bucket.remove(interaction.user.id)
+        g[user_id] = date
+        self._birthday_index.setdefault((guild_id, date[5:]), []).append(interaction.user.id)
         save_json(BIRTHDAYS_PATH, self.birthdays)
-        await interaction.followup.send(f"Birthday set to {date} for {interaction.user.mention} — everyone will see the wish on that day.")
+        await interaction.response.send_message(f"Birthday set to {date} for {interaction.user.mention} — everyone will see the wish on that day.")
 
     @app_commands.command(name="avatar", description="Show a user's server avatar (if they have one) or their global avatar")
     async def avatar(self, interaction: discord.Interaction, member: discord.Member = None):
@@ -309,30 +835,39 @@ class Cabbit(commands.Cog):
         await interaction.followup.send(embed=embed)
 
     @app_commands.command(name="setmodlog", description="Set a channel for moderation logs")
+    @app_commands.default_permissions(manage_guild=True)
     @app_commands.checks.has_permissions(manage_guild=True)
     async def setmodlog(self, interaction: discord.Interaction, channel: discord.TextChannel):
         await interaction.response.defer()
-        guild_id = str(interaction.guild_id)
-        self.modlog[guild_id] = str(channel.id)
+        guild_id = _sid(interaction.guild_id)
+        self.modlog[guild_id] = channel.id
+        self._modlog_channel_cache[interaction.guild_id] = channel
         save_json(MODLOG_PATH, self.modlog)
         await interaction.followup.send(f"Mod-log channel set to {channel.mention}")
 
     @app_commands.command(name="purge", description="Purge messages from a member (up to 100)")
+    @app_commands.default_permissions(manage_messages=True)
     @app_commands.checks.has_permissions(manage_messages=True)
     async def purge(self, interaction: discord.Interaction, member: discord.Member, limit: int = 10):
-        await interaction.response.defer()
         if limit < 1 or limit > 100:
-            await interaction.followup.send("Limit must be between 1 and 100")
+            await interaction.response.send_message("Limit must be between 1 and 100")
             return
+        await interaction.response.defer()
         try:
             chan = interaction.channel
-            count = [0]
-            def pred(m):
-                if m.author.id == member.id and count[0] < limit:
-                    count[0] += 1
-                    return True
-                return False
-            deleted = await chan.purge(limit=1000, check=pred, bulk=True)
+            deleted = []
+            async for m in chan.history(limit=1000):
+                if m.author.id == member.id:
+                    deleted.append(m)
+                    if len(deleted) >= limit:
+                        break
+            # History is newest first; bulk delete only accepts messages younger than 14 days
+            cutoff = discord.utils.utcnow() - timedelta(days=14)
+            recent = [m for m in deleted if m.created_at > cutoff]
+            if recent:
+                await chan.delete_messages(recent)
+            for m in deleted[len(recent):]:
+                await m.delete()
             msg = await interaction.followup.send(f"✅ Purged {len(deleted)} message{'s' if len(deleted) != 1 else ''} from {member.mention}.")
             await self._send_modlog(interaction.guild, f"{interaction.user} purged {len(deleted)} messages from {member} in {chan.mention}")
             await asyncio.sleep(3)
@@ -341,12 +876,13 @@ class Cabbit(commands.Cog):
             await interaction.followup.send(f"❌ Purge failed: {e}")
 
     @app_commands.command(name="purgeall", description="Purge messages from the channel (up to 100)")
+    @app_commands.default_permissions(manage_messages=True)
     @app_commands.checks.has_permissions(manage_messages=True)
     async def purgeall(self, interaction: discord.Interaction, limit: int = 10):
-        await interaction.response.defer()
         if limit < 1 or limit > 100:
-            await interaction.followup.send("Limit must be between 1 and 100")
+            await interaction.response.send_message("Limit must be between 1 and 100")
             return
+        await interaction.response.defer()
         try:
             chan = interaction.channel
             deleted = await chan.purge(limit=limit, bulk=True)
@@ -358,11 +894,12 @@ class Cabbit(commands.Cog):
             await interaction.followup.send(f"❌ Purge failed: {e}")
 
     @app_commands.command(name="antiraid", description="Set anti-raid action (off/ban/kick/mute/warn)")
+    @app_commands.default_permissions(administrator=True)
     @app_commands.checks.has_permissions(administrator=True)
     async def antiraid(self, interaction: discord.Interaction, action: str, messages: int = 20, window: int = 5, mute_duration: int = 30):
         """Use: /antiraid mute 20 5 30  (action, messages, window, mute_duration_in_minutes)"""
         await interaction.response.defer()
-        guild_id = str(interaction.guild_id)
+        guild_id = _sid(interaction.guild_id)
         action = action.lower()
 
         if action not in ["ban", "kick", "mute", "warn", "off"]:
@@ -375,6 +912,7 @@ class Cabbit(commands.Cog):
 
         if action == "off":
             self.antiraid[guild_id] = {"enabled": False, "action": "kick", "messages": 20, "window": 5, "mute_duration": 30}
+            self._rebuild_antiraid_index()
             save_json(ANTIRAID_PATH, self.antiraid)
             embed = discord.Embed(title="🛡️ Anti-Raid System", description="Anti-raid protection is now **DISABLED**", color=discord.Color.red())
             await interaction.followup.send(embed=embed)
@@ -386,10 +924,10 @@ class Cabbit(commands.Cog):
                 "window": window,
                 "mute_duration": mute_duration
             }
+            self._rebuild_antiraid_index()
             save_json(ANTIRAID_PATH, self.antiraid)
 
-            action_emoji = {"ban": "🔨", "kick": "👢", "mute": "🔇", "warn": "⚠️"}
-            emoji = action_emoji.get(action, "⚙️")
+            emoji = ANTIRAID_ACTION_EMOJI.get(action, "⚙️")
 
             embed = discord.Embed(
                 title="🛡️ Anti-Raid System",
@@ -416,7 +954,7 @@ class Cabbit(commands.Cog):
         embed.add_field(name="📅 Created", value=guild.created_at.strftime("%Y-%m-%d"), inline=True)
         embed.add_field(name="🔐 Roles", value=str(len(guild.roles)), inline=True)
 
-        roles_list = ", ".join([r.mention for r in sorted(guild.roles, key=lambda r: r.position, reverse=True)[:15]])
+        roles_list = ", ".join([r.mention for r in nlargest(15, guild.roles, key=_role_position)])
         if len(guild.roles) > 15:
             roles_list += f"\n... and {len(guild.roles) - 15} more"
         embed.add_field(name="📌 Top Roles", value=roles_list or "No roles", inline=False)
@@ -427,106 +965,68 @@ class Cabbit(commands.Cog):
 
     # ---------- AI reply system ----------
     @app_commands.command(name="aiset", description="Enable/disable AI responses")
+    @app_commands.default_permissions(administrator=True)
     @app_commands.checks.has_permissions(administrator=True)
     async def aiset(self, interaction: discord.Interaction, enabled: bool):
-        await interaction.response.defer()
-        guild_id = str(interaction.guild_id)
+        guild_id = _sid(interaction.guild_id)
         self.ai_enabled[guild_id] = enabled
         save_json(AI_ENABLED_PATH, self.ai_enabled)
         status = "✅ ENABLED" if enabled else "❌ DISABLED"
-        await interaction.followup.send(f"AI responses are now {status}")
+        await interaction.response.send_message(f"AI responses are now {status}")
 
     # ---------- Personality system (Owner & gto only) ----------
     @app_commands.command(name="setpersonality", description="Set bot personality (owner & gto only)")
     async def setpersonality(self, interaction: discord.Interaction, personality: str):
-        await interaction.response.defer()
-        owner_id = 1436351143516311622
-        gto_id = 1177669170981253132
-
-        if interaction.user.id not in [owner_id, gto_id]:
-            await interaction.followup.send("❌ Only the owner and bot maker can use this command!", ephemeral=True)
+        if interaction.user.id not in (OWNER_ID, GTO_ID):
+            await interaction.response.send_message("❌ Only the owner and bot maker can use this command!", ephemeral=True)
             return
 
         valid_personalities = ["brutal", "professional", "savage", "friendly", "sarcastic", "dark"]
         if personality.lower() not in valid_personalities:
-            await interaction.followup.send(f"❌ Invalid personality! Use: {', '.join(valid_personalities)}")
+            await interaction.response.send_message(f"❌ Invalid personality! Use: {', '.join(valid_personalities)}")
             return
 
         self.personality["global"] = personality.lower()
         save_json(PERSONALITY_PATH, self.personality)
-        await interaction.followup.send(f"✅ Personality set to **{personality.upper()}**!")
+        await interaction.response.send_message(f"✅ Personality set to **{personality.upper()}**!")
 
     # ---------- Staff applications system ----------
     @app_commands.command(name="setapplications", description="Open/close staff applications (owner & bot maker only)")
     async def setapplications(self, interaction: discord.Interaction, status: str):
-        await interaction.response.defer()
-        owner_id = 1436351143516311622
-        gto_id = 1177669170981253132
-
-        if interaction.user.id not in [owner_id, gto_id]:
-            await interaction.followup.send("❌ Only the owner and bot maker can use this command!", ephemeral=True)
+        if interaction.user.id not in (OWNER_ID, GTO_ID):
+            await interaction.response.send_message("❌ Only the owner and bot maker can use this command!", ephemeral=True)
             return
 
         if status.lower() not in ["open", "closed"]:
-            await interaction.followup.send("❌ Status must be 'open' or 'closed'")
+            await interaction.response.send_message("❌ Status must be 'open' or 'closed'")
             return
 
-        guild_id = str(interaction.guild_id)
+        guild_id = _sid(interaction.guild_id)
         self.applications[guild_id] = {"status": status.lower()}
         save_json(APPLICATIONS_PATH, self.applications)
 
         status_emoji = "🟢" if status.lower() == "open" else "🔴"
-        await interaction.followup.send(f"{status_emoji} Staff applications are now **{status.upper()}**!")
+        await interaction.response.send_message(f"{status_emoji} Staff applications are now **{status.upper()}**!")
 
     @app_commands.command(name="setwelcome", description="Set channel for welcome messages")
+    @app_commands.default_permissions(administrator=True)
     @app_commands.checks.has_permissions(administrator=True)
     async def setwelcome(self, interaction: discord.Interaction, channel: discord.TextChannel):
-        await interaction.response.defer()
-        guild_id = str(interaction.guild_id)
-        self.welcome_channels[guild_id] = str(channel.id)
+        self.welcome_channels[interaction.guild_id] = channel.id
+        self._welcome_channel_cache[interaction.guild_id] = channel
         save_json(WELCOME_PATH, self.welcome_channels)
-        await interaction.followup.send(f"✅ Welcome channel set to {channel.mention}\n🎉 New members will be welcomed there with a special gif!")
+        await interaction.response.send_message(f"✅ Welcome channel set to {channel.mention}\n🎉 New members will be welcomed there with a special gif!")
 
     @app_commands.command(name="setticketchannel", description="Set channel for ticket system")
+    @app_commands.default_permissions(administrator=True)
     @app_commands.checks.has_permissions(administrator=True)
     async def setticketchannel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         await interaction.response.defer()
-        guild_id = str(interaction.guild_id)
-        self.ticket_channels[guild_id] = str(channel.id)
+        guild_id = _sid(interaction.guild_id)
+        self.ticket_channels[guild_id] = _sid(channel.id)
         save_json(TICKETS_PATH, self.ticket_channels)
 
-        embed = discord.Embed(
-            title="🎫 Support Ticket System",
-            description="Need help? Create a support ticket by clicking one of the buttons below.\nEach ticket is private and only visible to you and our support team.",
-            color=discord.Color.blue()
-        )
-        embed.add_field(
-            name="🔧 Technical Support",
-            value="Report server bugs, connection issues, or technical problems",
-            inline=False
-        )
-        embed.add_field(
-            name="🚨 Report",
-            value="Report rule violations, harassment, or inappropriate behavior",
-            inline=False
-        )
-        embed.add_field(
-            name="❓ General Inquiry",
-            value="Ask questions about the server, rules, or other topics",
-            inline=False
-        )
-        embed.add_field(
-            name="👔 Staff Apply",
-            value="Apply to become a staff member - Answer comprehensive questions about your experience, moderation style, and commitment",
-            inline=False
-        )
-        embed.add_field(
-            name="📋 How It Works",
-            value="Click a button → Private channel created → Only you and admins see it",
-            inline=False
-        )
-        embed.set_footer(text="Click the button that matches your need")
-
+        embed = discord.Embed.from_dict(TICKET_EMBED_DICT)
         await channel.send(embed=embed, view=TicketView(bot_instance=self.bot))
         await interaction.followup.send(f"✅ Ticket system activated in {channel.mention}")
 
@@ -552,9 +1052,16 @@ class Cabbit(commands.Cog):
         embed.set_footer(text="This channel will be deleted in 10 seconds")
         await interaction.followup.send(embed=embed)
 
-        await asyncio.sleep(10)
+        if channel.id not in self._pending_deletes:
+            reason = f"Ticket closed by {interaction.user}"
+            self._pending_deletes[channel.id] = asyncio.get_running_loop().call_later(
+                10, lambda: self._spawn(self._delete_ticket_channel(channel, reason))
+            )
+
+    async def _delete_ticket_channel(self, channel, reason: str):
+        self._pending_deletes.pop(channel.id, None)
         try:
-            await channel.delete(reason=f"Ticket closed by {interaction.user}")
+            await channel.delete(reason=reason)
         except Exception as e:
             logger.exception("Failed to delete ticket channel: %s", e)
 
@@ -564,24 +1071,20 @@ class Cabbit(commands.Cog):
     async def birthday_task(self):
         # Runs hourly; checks for birthdays today and sends a public message
         try:
+            today = datetime.now().strftime("%m-%d")
             for guild in self.bot.guilds:
-                guild_id = str(guild.id)
-                if guild_id not in self.birthdays:
+                user_ids = self._birthday_index.get((_sid(guild.id), today))
+                if not user_ids:
                     continue
 
-                today = datetime.now().strftime("%m-%d")
                 birthdays_today = []
-                for user_id, birthday_str in self.birthdays[guild_id].items():
-                    if birthday_str[5:] == today:
-                        try:
-                            member = guild.get_member(int(user_id))
-                            if member:
-                                birthdays_today.append(member)
-                        except:
-                            pass
+                for user_id in user_ids:
+                    member = guild.get_member(user_id)
+                    if member:
+                        birthdays_today.append(member)
 
                 if birthdays_today:
-                    general_ch = discord.utils.get(guild.text_channels, name="general")
+                    general_ch = self._general_channel(guild)
                     if general_ch:
                         mentions = ", ".join([m.mention for m in birthdays_today])
                         await general_ch.send(f"🎂 Happy Birthday {mentions}! Hope you have a great day!")
@@ -592,6 +1095,109 @@ class Cabbit(commands.Cog):
     async def before_birthday_task(self):
         await self.bot.wait_until_ready()
 
+    # ---------- #general channel cache ----------
+    def _general_channel(self, guild: discord.Guild):
+        ch = guild.get_channel(self._general_ch.get(guild.id, 0))
+        if ch is None:
+            ch = discord.utils.get(guild.text_channels, name="general")
+            if ch:
+                self._general_ch[guild.id] = ch.id
+        return ch
+
+    def _invalidate_general_channel(self, channel):
+        if channel.name == "general" or self._general_ch.get(channel.guild.id) == channel.id:
+            self._general_ch.pop(channel.guild.id, None)
+
+    # ---------- Welcome channel cache ----------
+    def _welcome_channel(self, guild: discord.Guild):
+        ch = self._welcome_channel_cache.get(guild.id)
+        if ch is None and guild.id in self.welcome_channels:
+            ch = guild.get_channel(self.welcome_channels[guild.id])
+            if ch:
+                self._welcome_channel_cache[guild.id] = ch
+        return ch
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        for guild in self.bot.guilds:
+            self._general_channel(guild)
+            self._restore_rooms(guild)
+
+    def _restore_rooms(self, guild: discord.Guild):
+        # PERSONAL_VCS and vc_owners only live in memory; rebuild them from the control
+        # panels ("VC:<id>" topic) so rooms from before a restart still work and get cleaned up
+        if guild.id not in self.vc_interface:
+            return
+        for ch in guild.text_channels:
+            vc = guild.get_channel(_panel_room_id(ch) or 0)
+            if vc is None or vc.id in PERSONAL_VCS:
+                continue
+            PERSONAL_VCS[vc.id] = ch.id
+            owner_id = _panel_owner_id(ch)
+            if owner_id is not None:
+                self.vc_owners.setdefault(vc.id, (owner_id, ch.id, guild.id))
+            if not vc.members:
+                self._spawn(_delete_room_if_empty(vc))
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self._general_channel(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        self._invalidate_general_channel(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self._invalidate_general_channel(channel)
+        if self._modlog_channel_cache.get(channel.guild.id) is channel:
+            del self._modlog_channel_cache[channel.guild.id]
+        if self._welcome_channel_cache.get(channel.guild.id) is channel:
+            del self._welcome_channel_cache[channel.guild.id]
+        PERSONAL_VCS.pop(channel.id, None)
+        self.vc_owners.pop(channel.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild):
+        if before.name != after.name:
+            self._modlog_footer_cache.pop(after.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if before.name != after.name:
+            self._invalidate_general_channel(before)
+            self._invalidate_general_channel(after)
+
+    # Only roles gaining or losing administrator change the cached admin overwrites
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        if role.permissions.value & ADMINISTRATOR_BIT:
+            _admin_overwrites_cache.pop(role.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if (before.permissions.value ^ after.permissions.value) & ADMINISTRATOR_BIT:
+            _admin_overwrites_cache.pop(after.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        if role in _admin_overwrites_cache.get(role.guild.id, ()):
+            del _admin_overwrites_cache[role.guild.id]
+
+    @tasks.loop(minutes=WAL_COMPACT_MINUTES)
+    async def wal_compact_task(self):
+        # Fold the journals back into their snapshots so replay stays short
+        self._wal_warns.compact()
+        self._wal_conv.compact()
+
+    @tasks.loop(seconds=2)
+    async def modlog_flush_task(self):
+        for guild_id, fh in self._modlog_fhs.items():
+            try:
+                fh.flush()
+            except Exception:
+                logger.exception("Failed to flush modlog file for guild %s", guild_id)
+
     # ---------- Message event for anti-raid and AI replies ----------
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -599,20 +1205,30 @@ class Cabbit(commands.Cog):
             return
 
         guild = message.guild
-        guild_id = str(guild.id)
+        guild_id = _sid(guild.id)
 
         # Ignore bot's own messages
-        if message.author.id == self.bot.user.id:
+        if message.author.id == self._bot_id:
+            return
+
+        # Most messages neither mention the bot nor come from an anti-raid guild
+        # message.mentions is parsed from the payload (and includes reply pings);
+        # raw_mentions would run a regex over the content on every message
+        mentioned = any(u.id == self._bot_id for u in message.mentions)
+        antiraid_enabled = guild_id in self._antiraid_enabled
+        if not mentioned and not antiraid_enabled:
             return
 
         # AI reply with conversation memory
-        if message.mentions and self.bot.user in message.mentions:
+        if mentioned:
             ai_enabled = self.ai_enabled.get(guild_id, False)
             if ai_enabled and HAS_OPENAI:
                 try:
                     # Get conversation history
-                    channel_id = str(message.channel.id)
-                    conversation = self.conv_memory.get(channel_id, [])
+                    channel_id = _sid(message.channel.id)
+                    conversation = self.conv_memory.get(channel_id)
+                    if conversation is None:
+                        conversation = self.conv_memory[channel_id] = _new_conversation()
 
                     # Get personality
                     personality = self.personality.get("global", "brutal")
@@ -623,35 +1239,25 @@ class Cabbit(commands.Cog):
                         "message": message.content
                     })
 
-                    # Keep only last 10 messages
-                    if len(conversation) > 10:
-                        conversation = conversation[-10:]
+                    # Keep the history bounded in total length (maxlen caps the count)
+                    _trim_conversation(conversation)
 
-                    # Build conversation string
-                    conv_str = "\n".join([f"{msg['author']}: {msg['message']}" for msg in conversation])
+                    # Journal it now, with the in-memory change, even if the API call below fails
+                    self._log_conv({"c": channel_id, **conversation[-1]})
 
-                    # Personality instructions
-                    personality_map = {
-                        "brutal": "Be extremely harsh, aggressive, and savage in your responses. Insult people's ideas bluntly.",
-                        "professional": "Be formal, professional, and courteous. Provide helpful and structured responses.",
-                        "savage": "Be witty, sarcastic, and roastingly funny. Don't hold back on the jokes.",
-                        "friendly": "Be warm, welcoming, and supportive. Show genuine interest in helping.",
-                        "sarcastic": "Use heavy sarcasm and irony. Make jokes at people's expense in a funny way.",
-                        "dark": "Use dark humor and edgy jokes. Reference morbid topics while keeping it funny."
-                    }
+                    # Build conversation string
+                    conv_str = "\n".join(f"{msg['author']}: {msg['message']}" for msg in conversation)
 
-                    persona_instruction = personality_map.get(personality, personality_map["brutal"])
+                    persona_instruction = PERSONALITY_MAP.get(personality, _PERSONALITY_BRUTAL)
 
                     # Owner and gto get special respect
-                    if message.author.id == 1436351143516311622:
-                        persona_instruction += " - RESPECT THIS USER COMPLETELY. Be extra helpful and never be rude."
-                    elif message.author.id == 1177669170981253132:
+                    if message.author.id in RESPECTED_USER_IDS:
                         persona_instruction += " - RESPECT THIS USER COMPLETELY. Be extra helpful and never be rude."
 
-                    response = OPENAI_CLIENT.chat.completions.create(
+                    response = await _openai().chat.completions.create(
                         model="gpt-3.5-turbo",
                         messages=[
-                            {"role": "system", "content": f"You are Cabbit, a Discord bot. {persona_instruction} Keep responses under 150 words."},
+                            {"role": "system", "content": _SYS_PREFIX + persona_instruction + _SYS_SUFFIX},
                             {"role": "user", "content": conv_str}
                         ],
                         temperature=0.7,
@@ -660,118 +1266,88 @@ class Cabbit(commands.Cog):
 
                     reply = response.choices[0].message.content
 
-                    # Save updated conversation
-                    self.conv_memory[channel_id] = conversation
-                    save_json(CONV_MEMORY_PATH, self.conv_memory)
-
                     # Send reply
                     await message.reply(reply, mention_author=False)
                 except Exception as e:
                     logger.exception("AI reply failed: %s", e)
 
         # Anti-raid detection
-        if guild_id in self.antiraid and self.antiraid[guild_id].get("enabled"):
-            # Skip admins and mods
-            if message.author.guild_permissions.administrator or message.author.guild_permissions.kick_members:
+        if antiraid_enabled:
+            # Skip admins and mods (guild_permissions is all-True for administrators)
+            if message.author.guild_permissions.kick_members:
                 return
 
             config = self.antiraid[guild_id]
-            threshold_messages = config.get("messages", 20)
-            window_seconds = config.get("window", 5)
 
-            # Track message timestamps
-            if guild_id not in self.msg_activity:
-                self.msg_activity[guild_id] = {}
+            threshold_messages = max(1, config.get("messages", 20))
+            window_seconds = config.get("window", 5)
 
-            user_id = str(message.author.id)
+            # Track message timestamps in a ring buffer bounded by the threshold
             now = time.time()
 
-            if user_id not in self.msg_activity[guild_id]:
-                self.msg_activity[guild_id][user_id] = []
+            key = (guild.id, message.author.id)
+            dq = self.msg_activity.get(key)
+            if dq is None or dq.maxlen != threshold_messages:
+                dq = self.msg_activity[key] = deque(dq or (), maxlen=threshold_messages)
 
-            # Clean old timestamps
-            self.msg_activity[guild_id][user_id] = [
-                t for t in self.msg_activity[guild_id][user_id]
-                if now - t < window_seconds
-            ]
-
-            self.msg_activity[guild_id][user_id].append(now)
-
-            # Check if threshold exceeded
-            if len(self.msg_activity[guild_id][user_id]) >= threshold_messages:
+            # maxlen evicts the oldest entry, so a full buffer whose oldest timestamp is
+            # still inside the window means threshold messages arrived within it
+            dq.append(now)
+            if len(dq) >= threshold_messages and now - dq[0] < window_seconds:
                 action = config.get("action", "kick")
 
                 try:
-                    if action == "ban":
-                        await message.author.ban(reason="Anti-raid ban")
-                    elif action == "kick":
-                        await message.author.kick(reason="Anti-raid kick")
-                    elif action == "mute":
-                        minutes = config.get("mute_duration", 30)
-                        until = datetime.now(timezone.utc) + timedelta(minutes=minutes)
-                        await message.author.timeout(until, reason="Anti-raid mute")
-                    elif action == "warn":
-                        guild_id_key = str(guild.id)
-                        g = self.warns.setdefault(guild_id_key, {})
-                        m = g.setdefault(str(message.author.id), [])
-                        m.append({
-                            "moderator": "Anti-raid system",
-                            "reason": "Spam detected",
-                            "time": datetime.utcnow().isoformat()
-                        })
-                        save_json(WARNS_PATH, self.warns)
+                    handler = ANTIRAID_ACTIONS.get(action, _antiraid_kick)
+                    await handler(self, message.author, config, guild_id)
 
                     # Clear activity
-                    self.msg_activity[guild_id][user_id] = []
+                    dq.clear()
 
-                    # Send modlog
-                    await self._send_modlog(guild, f"⚠️ Anti-raid {action} triggered for {message.author} ({message.author.id})")
+                    # Send modlog in the background; only the punishment itself is awaited
+                    self._spawn(self._send_modlog(guild, f"⚠️ Anti-raid {action} triggered for {message.author} ({message.author.id})", guild_id=guild_id))
                 except Exception as e:
                     logger.exception("Anti-raid action failed: %s", e)
 
-    async def _send_modlog(self, guild: discord.Guild, content: str):
-        guild_id = str(guild.id)
+    def _write_modlog_file(self, guild_id: str, content: str):
+        fh = self._modlog_fhs.get(guild_id)
+        if fh is None:
+            fh = self._modlog_fhs[guild_id] = open(os.path.join(MODLOG_DIR, f"{guild_id}.log"), "ab", buffering=1 << 16)
+        fh.write(f"{_now_iso()} {content}\n".encode("utf-8"))
+
+    async def _send_modlog(self, guild: discord.Guild, content: str, guild_id: str = None):
+        guild_id = guild_id or _sid(guild.id)
+        try:
+            self._write_modlog_file(guild_id, content)
+        except Exception:
+            logger.exception("Failed to write modlog file for guild %s", guild_id)
+
         if guild_id not in self.modlog:
             return
 
         try:
-            ch = guild.get_channel(int(self.modlog[guild_id]))
+            ch = self._modlog_channel_cache.get(guild.id)
+            if ch is None:
+                ch = guild.get_channel(self.modlog[guild_id])
+                if ch:
+                    self._modlog_channel_cache[guild.id] = ch
             if ch:
-                color = discord.Color.red()
-                action = "🔨 ACTION"
-
-                if "kicked" in content.lower():
-                    color = discord.Color.orange()
-                    action = "👢 KICK"
-                elif "banned" in content.lower():
-                    color = discord.Color.red()
-                    action = "🔨 BAN"
-                elif "muted" in content.lower() or "timeout" in content.lower():
-                    color = discord.Color.gold()
-                    action = "🔇 MUTE"
-                elif "unmuted" in content.lower():
-                    color = discord.Color.green()
-                    action = "🔊 UNMUTE"
-                elif "unbanned" in content.lower():
-                    color = discord.Color.green()
-                    action = "✅ UNBAN"
-                elif "removewarn" in content.lower():
-                    color = discord.Color.green()
-                    action = "✅ WARN CLEARED"
-                elif "purged" in content.lower():
-                    color = discord.Color.purple()
-                    action = "🧹 PURGE"
-                else:
-                    color = discord.Color.greyple()
-                    action = "📋 ACTION"
+                low = content.lower()
+                color, action = _MODLOG_DEFAULT
+                for keyword, style in MODLOG_RULES:
+                    if keyword in low:
+                        color, action = style
+                        break
 
                 embed = discord.Embed(
                     title=action,
                     description=content,
                     color=color,
-                    timestamp=datetime.now(timezone.utc)
+                    timestamp=datetime.now(_UTC)
                 )
-                embed.set_footer(text=f"Guild: {guild.name}")
+                footer = self._modlog_footer_cache.get(guild.id)
+                if footer is None:
+                    footer = self._modlog_footer_cache[guild.id] = f"Guild: {guild.name}"
+                embed.set_footer(text=footer)
                 await ch.send(embed=embed)
         except Exception:
             logger.exception("Failed to send modlog for guild %s", getattr(guild, "id", None))
@@ -795,8 +1371,8 @@ class TicketView(discord.ui.View):
             logger.exception("Ticket button error: %s", e)
             try:
                 await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
-            except:
-                pass
+            except discord.DiscordException:
+                pass  # already responded to, or the interaction expired
 
     @discord.ui.button(label="Report", style=discord.ButtonStyle.danger, emoji="🚨", custom_id="ticket_report")
     async def report(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -806,8 +1382,8 @@ class TicketView(discord.ui.View):
             logger.exception("Ticket button error: %s", e)
             try:
                 await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
-            except:
-                pass
+            except discord.DiscordException:
+                pass  # already responded to, or the interaction expired
 
     @discord.ui.button(label="General Inquiry", style=discord.ButtonStyle.success, emoji="❓", custom_id="ticket_inquiry")
     async def inquiry(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -817,8 +1393,8 @@ class TicketView(discord.ui.View):
             logger.exception("Ticket button error: %s", e)
             try:
                 await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
-            except:
-                pass
+            except discord.DiscordException:
+                pass  # already responded to, or the interaction expired
 
     @discord.ui.button(label="Staff Apply", style=discord.ButtonStyle.blurple, emoji="👔", custom_id="ticket_staff_apply")
     async def staff_apply(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -828,13 +1404,13 @@ class TicketView(discord.ui.View):
             logger.exception("Ticket button error: %s", e)
             try:
                 await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
-            except:
-                pass
+            except discord.DiscordException:
+                pass  # already responded to, or the interaction expired
 
 
 class LimitMenu(discord.ui.View):
     def __init__(self):
-        super().__init__(timeout=60)
+        super().__init__(timeout=None)
 
     @discord.ui.select(placeholder="Select member limit...", options=[
         discord.SelectOption(label="5 Members", value="5"),
@@ -860,7 +1436,7 @@ class LimitMenu(discord.ui.View):
 
 class BitrateMen(discord.ui.View):
     def __init__(self):
-        super().__init__(timeout=60)
+        super().__init__(timeout=None)
 
     @discord.ui.select(placeholder="Select audio bitrate...", options=[
         discord.SelectOption(label="8 kbps", value="8000"),
@@ -887,7 +1463,7 @@ class BitrateMen(discord.ui.View):
 
 class RegionMenu(discord.ui.View):
     def __init__(self):
-        super().__init__(timeout=60)
+        super().__init__(timeout=None)
 
     @discord.ui.select(placeholder="Select region...", options=[
         discord.SelectOption(label="US East", value="us-east"),
@@ -911,6 +1487,21 @@ class RegionMenu(discord.ui.View):
             await interaction.followup.send(f"❌ Failed: {e}", ephemeral=True)
 
 
+# The limit/bitrate/region menus and the room control panel hold no state (they act
+# on the caller's current voice channel), so one instance of each is shared by every
+# room. Views need a running event loop, hence the lazy construction. Ephemeral sends
+# give timeout=None views a 15-minute timeout, after which the view is stopped for
+# good, so a finished instance is replaced.
+_SHARED_MENUS = {}
+
+
+def _shared_menu(view_cls):
+    view = _SHARED_MENUS.get(view_cls)
+    if view is None or view.is_finished():
+        view = _SHARED_MENUS[view_cls] = view_cls()
+    return view
+
+
 class RenameModal(discord.ui.Modal):
     def __init__(self):
         super().__init__(title="Rename Voice Channel")
@@ -981,20 +1572,38 @@ class MemberSelectView(discord.ui.View):
 
 
 class InterfaceMenuView(discord.ui.View):
-    def __init__(self, vc_owner_id: int = None):
+    # Persistent and shared by every room's control panel: the room is found from the
+    # panel channel's "VC:<id>" topic and its owner from Cabbit.vc_owners.
+    def __init__(self):
         super().__init__(timeout=None)
-        self.vc_owner_id = vc_owner_id
-        self.is_locked = False
-        self.is_hidden = False
+
+    @staticmethod
+    def _room_id(interaction: discord.Interaction):
+        return _panel_room_id(interaction.channel)
+
+    @staticmethod
+    def _owner_id(interaction: discord.Interaction):
+        room_id = _panel_room_id(interaction.channel)
+        if room_id is None:
+            return None
+        entry = CABBIT.vc_owners.get(room_id)
+        if entry is None:
+            # Not known in memory (e.g. the panel predates a restart): recover it from the panel
+            owner_id = _panel_owner_id(interaction.channel)
+            if owner_id is None:
+                return None
+            entry = CABBIT.vc_owners[room_id] = (owner_id, interaction.channel.id, interaction.guild_id)
+        return entry[0]
 
     async def _owner_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.user.id != self.vc_owner_id and not interaction.user.guild_permissions.administrator:
+        owner_id = self._owner_id(interaction)
+        if interaction.user.id != owner_id and not interaction.user.guild_permissions.administrator:
             await interaction.response.defer()
             await interaction.followup.send("❌ Only the owner can use this!", ephemeral=True)
             return False
         return True
 
-    @discord.ui.button(label="Lock", style=discord.ButtonStyle.secondary, emoji="🔒", row=0)
+    @discord.ui.button(label="Lock", style=discord.ButtonStyle.secondary, emoji="🔒", row=0, custom_id="vcmenu_lock")
     async def lock_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
@@ -1005,14 +1614,11 @@ class InterfaceMenuView(discord.ui.View):
                 await interaction.followup.send("❌ You must be in a voice channel!", ephemeral=True)
                 return
             await vc.edit(user_limit=len(vc.members))
-            self.is_locked = True
-            button.disabled = True
-            await interaction.message.edit(view=self)
             await interaction.followup.send(f"🔒 Channel locked!", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Failed: {e}", ephemeral=True)
 
-    @discord.ui.button(label="Unlock", style=discord.ButtonStyle.secondary, emoji="🔓", row=0)
+    @discord.ui.button(label="Unlock", style=discord.ButtonStyle.secondary, emoji="🔓", row=0, custom_id="vcmenu_unlock")
     async def unlock_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
@@ -1023,12 +1629,11 @@ class InterfaceMenuView(discord.ui.View):
                 await interaction.followup.send("❌ You must be in a voice channel!", ephemeral=True)
                 return
             await vc.edit(user_limit=None)
-            self.is_locked = False
             await interaction.followup.send(f"🔓 Channel unlocked!", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Failed: {e}", ephemeral=True)
 
-    @discord.ui.button(label="Hide", style=discord.ButtonStyle.secondary, emoji="👁️", row=0)
+    @discord.ui.button(label="Hide", style=discord.ButtonStyle.secondary, emoji="👁️", row=0, custom_id="vcmenu_hide")
     async def hide_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
@@ -1039,12 +1644,11 @@ class InterfaceMenuView(discord.ui.View):
                 await interaction.followup.send("❌ You must be in a voice channel!", ephemeral=True)
                 return
             await vc.edit(position=-1)
-            self.is_hidden = True
             await interaction.followup.send(f"👁️ Channel hidden!", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Failed: {e}", ephemeral=True)
 
-    @discord.ui.button(label="Unhide", style=discord.ButtonStyle.secondary, emoji="👁️", row=0)
+    @discord.ui.button(label="Unhide", style=discord.ButtonStyle.secondary, emoji="👁️", row=0, custom_id="vcmenu_unhide")
     async def unhide_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
@@ -1055,18 +1659,17 @@ class InterfaceMenuView(discord.ui.View):
                 await interaction.followup.send("❌ You must be in a voice channel!", ephemeral=True)
                 return
             await vc.edit(position=0)
-            self.is_hidden = False
             await interaction.followup.send(f"👁️ Channel visible!", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"❌ Failed: {e}", ephemeral=True)
 
-    @discord.ui.button(label="Limit", style=discord.ButtonStyle.secondary, emoji="👥", row=1)
+    @discord.ui.button(label="Limit", style=discord.ButtonStyle.secondary, emoji="👥", row=1, custom_id="vcmenu_limit")
     async def limit_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
-        await interaction.response.send_message("👥 **Select a member limit:**", view=LimitMenu(), ephemeral=True)
+        await interaction.response.send_message("👥 **Select a member limit:**", view=_shared_menu(LimitMenu), ephemeral=True)
 
-    @discord.ui.button(label="Invite", style=discord.ButtonStyle.secondary, emoji="👤", row=1)
+    @discord.ui.button(label="Invite", style=discord.ButtonStyle.secondary, emoji="👤", row=1, custom_id="vcmenu_invite")
     async def invite_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
@@ -1075,7 +1678,9 @@ class InterfaceMenuView(discord.ui.View):
             if not vc:
                 await interaction.response.send_message("❌ You must be in a voice channel!", ephemeral=True)
                 return
-            available = [m for m in interaction.guild.members if m not in vc.members and not m.bot]
+            # The select menu shows at most 25 options, so stop scanning once we have them
+            in_vc = {m.id for m in vc.members}
+            available = list(islice((m for m in interaction.guild.members if m.id not in in_vc and not m.bot), 25))
             if not available:
                 await interaction.response.send_message("❌ No members to invite!", ephemeral=True)
                 return
@@ -1083,7 +1688,7 @@ class InterfaceMenuView(discord.ui.View):
         except Exception as e:
             await interaction.response.send_message(f"❌ Failed: {e}", ephemeral=True)
 
-    @discord.ui.button(label="Ban", style=discord.ButtonStyle.danger, emoji="👤", row=1)
+    @discord.ui.button(label="Ban", style=discord.ButtonStyle.danger, emoji="👤", row=1, custom_id="vcmenu_ban")
     async def ban_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
@@ -1097,7 +1702,7 @@ class InterfaceMenuView(discord.ui.View):
         except Exception as e:
             await interaction.response.send_message(f"❌ Failed: {e}", ephemeral=True)
 
-    @discord.ui.button(label="Permit", style=discord.ButtonStyle.secondary, emoji="✅", row=1)
+    @discord.ui.button(label="Permit", style=discord.ButtonStyle.secondary, emoji="✅", row=1, custom_id="vcmenu_permit")
     async def permit_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
@@ -1106,7 +1711,9 @@ class InterfaceMenuView(discord.ui.View):
             if not vc:
                 await interaction.response.send_message("❌ You must be in a voice channel!", ephemeral=True)
                 return
-            banned = [m for m in interaction.guild.members if not vc.permissions_for(m).connect]
+            # Room bans are member overwrites with connect denied; read them off the channel
+            banned = list(islice((target for target, ow in vc.overwrites.items()
+                                  if isinstance(target, discord.Member) and ow.connect is False), 25))
             if not banned:
                 await interaction.response.send_message("❌ No banned members!", ephemeral=True)
                 return
@@ -1114,25 +1721,25 @@ class InterfaceMenuView(discord.ui.View):
         except Exception as e:
             await interaction.response.send_message(f"❌ Failed: {e}", ephemeral=True)
 
-    @discord.ui.button(label="Rename", style=discord.ButtonStyle.secondary, emoji="✏️", row=2)
+    @discord.ui.button(label="Rename", style=discord.ButtonStyle.secondary, emoji="✏️", row=2, custom_id="vcmenu_rename")
     async def rename_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
         await interaction.response.send_modal(RenameModal())
 
-    @discord.ui.button(label="Bitrate", style=discord.ButtonStyle.secondary, emoji="🎧", row=2)
+    @discord.ui.button(label="Bitrate", style=discord.ButtonStyle.secondary, emoji="🎧", row=2, custom_id="vcmenu_bitrate")
     async def bitrate_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
-        await interaction.response.send_message("🎧 **Select audio bitrate:**", view=BitrateMen(), ephemeral=True)
+        await interaction.response.send_message("🎧 **Select audio bitrate:**", view=_shared_menu(BitrateMen), ephemeral=True)
 
-    @discord.ui.button(label="Region", style=discord.ButtonStyle.secondary, emoji="🌐", row=2)
+    @discord.ui.button(label="Region", style=discord.ButtonStyle.secondary, emoji="🌐", row=2, custom_id="vcmenu_region")
     async def region_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
-        await interaction.response.send_message("🌐 **Select a region:**", view=RegionMenu(), ephemeral=True)
+        await interaction.response.send_message("🌐 **Select a region:**", view=_shared_menu(RegionMenu), ephemeral=True)
 
-    @discord.ui.button(label="Template", style=discord.ButtonStyle.secondary, emoji="📋", row=2)
+    @discord.ui.button(label="Template", style=discord.ButtonStyle.secondary, emoji="📋", row=2, custom_id="vcmenu_template")
     async def template_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
@@ -1147,7 +1754,7 @@ class InterfaceMenuView(discord.ui.View):
         except Exception as e:
             await interaction.followup.send(f"❌ Failed: {e}", ephemeral=True)
 
-    @discord.ui.button(label="Chat", style=discord.ButtonStyle.success, emoji="💬", row=3)
+    @discord.ui.button(label="Chat", style=discord.ButtonStyle.success, emoji="💬", row=3, custom_id="vcmenu_chat")
     async def chat_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer()
         try:
@@ -1157,7 +1764,7 @@ class InterfaceMenuView(discord.ui.View):
         except Exception as e:
             await interaction.followup.send(f"❌ Failed: {e}", ephemeral=True)
 
-    @discord.ui.button(label="Waiting", style=discord.ButtonStyle.secondary, emoji="⏳", row=3)
+    @discord.ui.button(label="Waiting", style=discord.ButtonStyle.secondary, emoji="⏳", row=3, custom_id="vcmenu_waiting")
     async def waiting_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
@@ -1172,17 +1779,27 @@ class InterfaceMenuView(discord.ui.View):
         except Exception as e:
             await interaction.followup.send(f"❌ Failed: {e}", ephemeral=True)
 
-    @discord.ui.button(label="Claim", style=discord.ButtonStyle.secondary, emoji="👑", row=3)
+    @discord.ui.button(label="Claim", style=discord.ButtonStyle.secondary, emoji="👑", row=3, custom_id="vcmenu_claim")
     async def claim_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer()
         vc = interaction.user.voice.channel if interaction.user.voice else None
         if not vc or len(vc.members) < 2:
             await interaction.followup.send("❌ Need at least 2 members!", ephemeral=True)
             return
-        self.vc_owner_id = interaction.user.id
+        room_id = self._room_id(interaction)
+        if room_id is None or vc.id != room_id:
+            await interaction.followup.send("❌ You must be in this panel's room!", ephemeral=True)
+            return
+        # Only an abandoned room can be claimed (admins may always take over)
+        owner_id = self._owner_id(interaction)
+        if (owner_id is not None and any(m.id == owner_id for m in vc.members)
+                and not interaction.user.guild_permissions.administrator):
+            await interaction.followup.send("❌ The owner is still in the room!", ephemeral=True)
+            return
+        CABBIT.vc_owners[room_id] = (interaction.user.id, interaction.channel.id, interaction.guild_id)
         await interaction.followup.send(f"👑 You are now the owner!", ephemeral=True)
 
-    @discord.ui.button(label="Transfer", style=discord.ButtonStyle.secondary, emoji="👉", row=3)
+    @discord.ui.button(label="Transfer", style=discord.ButtonStyle.secondary, emoji="👉", row=3, custom_id="vcmenu_transfer")
     async def transfer_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not await self._owner_check(interaction):
             return
@@ -1197,10 +1814,82 @@ class InterfaceMenuView(discord.ui.View):
             await interaction.response.send_message(f"❌ Failed: {e}", ephemeral=True)
 
 
+# ---------- Private channel overwrites ----------
+# Shared by every ticket/room; discord.py only reads overwrites, so never mutate these.
+DENY_OW = discord.PermissionOverwrite(view_channel=False)
+MEMBER_OW = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
+BOT_OW = discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_channels=True)
+
+# Role checks test the raw bitfield instead of going through Permissions.administrator
+ADMINISTRATOR_BIT = 0x8
+
+# Admin-role overwrites are the same for every ticket/room in a guild; they are
+# rebuilt only after a role change (see the Cabbit role listeners).
+_admin_overwrites_cache = {}
+
+
+def _admin_overwrites(guild: discord.Guild) -> dict:
+    overwrites = _admin_overwrites_cache.get(guild.id)
+    if overwrites is None:
+        overwrites = {role: MEMBER_OW for role in guild.roles if role.permissions.value & ADMINISTRATOR_BIT}
+        _admin_overwrites_cache[guild.id] = overwrites
+    return overwrites
+
+
+def _build_private_overwrites(guild: discord.Guild, user: discord.Member, extra_roles=()) -> dict:
+    """Overwrites for a channel only ``user``, admins and ``extra_roles`` can see."""
+    overwrites = {guild.default_role: DENY_OW, user: MEMBER_OW, guild.me: BOT_OW}
+    overwrites.update(_admin_overwrites(guild))
+    for role in extra_roles:
+        if role:
+            overwrites[role] = MEMBER_OW
+    return overwrites
+
+
+# ---------- Personal voice rooms ----------
+# vc.id -> id of its control-panel text channel (0 if that could not be created).
+# Rooms are removed from on_voice_state_update once the last member leaves.
+PERSONAL_VCS = {}
+ROOM_GRACE_SECONDS = 2
+
+
+def _panel_room_id(channel):
+    """Voice channel id from a control panel's "VC:<id>" topic, or None."""
+    topic = getattr(channel, "topic", None) or ""
+    if topic.startswith("VC:") and topic[3:].isdigit():
+        return int(topic[3:])
+    return None
+
+
+def _panel_owner_id(channel):
+    """The room owner: the one member given an overwrite on its panel when it was created."""
+    me_id = channel.guild.me.id
+    members = [t.id for t in channel.overwrites if not isinstance(t, discord.Role) and t.id != me_id]
+    return members[0] if len(members) == 1 else None
+
+
+async def _delete_room_if_empty(vc: discord.VoiceChannel):
+    await asyncio.sleep(ROOM_GRACE_SECONDS)
+    if vc.members:
+        return
+    text_id = PERSONAL_VCS.pop(vc.id, None)
+    if text_id is None:
+        return  # already handled by an earlier leave
+    CABBIT.vc_owners.pop(vc.id, None)
+    text_ch = vc.guild.get_channel(text_id)
+    channels = (vc, text_ch) if text_ch else (vc,)
+    results = await asyncio.gather(*(ch.delete() for ch in channels), return_exceptions=True)
+    for ch, result in zip(channels, results):
+        if isinstance(result, discord.HTTPException):
+            logger.warning("Failed to delete personal room channel %s: %s", ch.id, result)
+        elif isinstance(result, BaseException):
+            raise result
+
+
 async def create_personal_vc(user: discord.Member, guild: discord.Guild, cog):
     text_ch = None
     try:
-        guild_id = str(guild.id)
+        guild_id = _sid(guild.id)
 
         # Get category from stored menu config
         category_id = 1441157308456632401
@@ -1211,6 +1900,7 @@ async def create_personal_vc(user: discord.Member, guild: discord.Guild, cog):
 
         vc_name = f"🔊 {user.display_name}"
         new_vc = await guild.create_voice_channel(name=vc_name, category=category)
+        PERSONAL_VCS[new_vc.id] = 0
         await user.move_to(new_vc)
 
         # Send menu embed
@@ -1222,39 +1912,21 @@ async def create_personal_vc(user: discord.Member, guild: discord.Guild, cog):
 
         # Create a text channel linked to this VC for the menu (only visible to owner and admins)
         try:
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                user: discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True),
-                guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_channels=True)
-            }
-
-            for role in guild.roles:
-                if role.permissions.administrator:
-                    overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
-
             text_ch = await guild.create_text_channel(
-                name=f"room-{user.name[:10]}",
+                name=f"room-{_safe_channel_fragment(user.name)}",
                 category=category,
                 topic=f"VC:{new_vc.id}",
-                overwrites=overwrites
+                overwrites=_build_private_overwrites(guild, user)
             )
-            await text_ch.send(embed=embed, view=InterfaceMenuView(vc_owner_id=user.id))
-        except:
-            pass
-
-        # Auto-delete when empty
-        async def delete_vc_when_empty():
-            while len(new_vc.members) > 0:
-                await asyncio.sleep(5)
-            await asyncio.sleep(2)
-            try:
-                await new_vc.delete()
-                if text_ch:
-                    await text_ch.delete()
-            except:
-                pass
-
-        asyncio.create_task(delete_vc_when_empty())
+            PERSONAL_VCS[new_vc.id] = text_ch.id
+            cog.vc_owners[new_vc.id] = (user.id, text_ch.id, guild.id)
+            await text_ch.send(embed=embed, view=_shared_menu(InterfaceMenuView))
+        except discord.HTTPException as e:
+            logger.warning("Failed to create control panel for VC %s: %s", new_vc.id, e)
+
+        # Covers the owner disconnecting before the move landed; afterwards the
+        # room is deleted from on_voice_state_update when it empties.
+        cog._spawn(_delete_room_if_empty(new_vc))
     except Exception as e:
         logger.exception("Failed to create personal VC: %s", e)
 
@@ -1266,30 +1938,18 @@ async def create_ticket(interaction: discord.Interaction, ticket_type: str, is_s
 
     # Check if applications are open for staff applications
     if is_staff_apply and cog:
-        guild_id = str(guild.id)
+        guild_id = _sid(guild.id)
         if guild_id not in cog.applications or cog.applications[guild_id].get("status") != "open":
             await interaction.followup.send("❌ Staff applications are currently closed!", ephemeral=True)
             return
 
-    overwrites = {
-        guild.default_role: discord.PermissionOverwrite(view_channel=False),
-        user: discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True),
-        guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_channels=True)
-    }
-
-    # Add admin roles and the support role to overwrites
-    support_role = guild.get_role(1441334848878022656)
-    if support_role:
-        overwrites[support_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
-
-    for role in guild.roles:
-        if role.permissions.administrator:
-            overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, read_message_history=True)
+    # Visible to the user, admins and the support role
+    support_role = guild.get_role(SUPPORT_ROLE_ID)
 
     try:
         channel = await guild.create_text_channel(
-            name=f"ticket-{user.name[:10]}",
-            overwrites=overwrites,
+            name=f"ticket-{_safe_channel_fragment(user.name)}",
+            overwrites=_build_private_overwrites(guild, user, extra_roles=(support_role,)),
             reason=f"Support ticket by {user} ({ticket_type})"
         )
 
@@ -1302,50 +1962,33 @@ async def create_ticket(interaction: discord.Interaction, ticket_type: str, is_s
         embed.add_field(name="User", value=user.mention, inline=True)
         embed.set_footer(text=f"Only you and admins can see this channel")
 
-        await channel.send(embed=embed)
-
-        # If staff application, ask questions
+        # If staff application, ask questions and ping bot maker and owner;
+        # for other ticket types, ping support role
         if is_staff_apply:
-            questions = [
-                "**Q1:** What is your Discord username + tag?",
-                "**Q2:** What is your age?",
-                "**Q3:** What country/timezone are you in?",
-                "**Q4:** How active are you daily? (Hours)",
-                "**Q5:** How long have you been in the server?",
-                "**Q6:** Why do you want to become staff here?",
-                "**Q7:** What do you like the most about our server?",
-                "**Q8:** Do you have any previous moderation experience? If yes, explain.",
-                "**Q9:** What skills or strengths make you a good staff member?",
-                "**Q10:** What are your weaknesses as a staff member? (good question to see honesty)",
-                "**Q11:** A member is spamming but not breaking major rules — what do you do?",
-                "**Q12:** Two members start arguing and it becomes toxic — how do you handle it?",
-                "**Q13:** Your friend breaks a rule — what would you do?",
-                "**Q14:** A user reports harassment but provides no evidence — what's your action?",
-                "**Q15:** Someone accuses staff of abuse — how do you handle the situation?",
-                "**Q16:** How do you react to pressure or stressful situations?",
-                "**Q17:** How would you describe your moderation style? (strict, calm, neutral, etc.)",
-                "**Q18:** Are you able to work as a team and accept feedback/criticism?",
-                "**Q19:** What motivates you to stay active as staff?",
-                "**Q20:** Can you stay unbiased, even with friends or drama?",
-                "**Q21:** How long do you plan to stay as a staff member?",
-                "**Q22:** Are you willing to learn the rules and follow all staff guidelines?",
-                "**Q23:** Why should we pick YOU over other applicants? (This reveals confidence and personality)"
-            ]
-
-            for q in questions:
-                await channel.send(q)
-
-            # Ping bot maker and owner
-            owner_id = 1436351143516311622
-            gto_id = 1177669170981253132
-            await channel.send(f"<@{owner_id}> <@{gto_id}> - New staff application!")
+            texts = [*STAFF_QUESTIONS_MESSAGES, STAFF_APPLICATION_PING]
+        elif support_role:
+            texts = [f"{support_role.mention} - New {ticket_type.lower()} ticket created!"]
         else:
-            # For other ticket types, ping support role
-            support_role = guild.get_role(1441334848878022656)
-            if support_role:
-                await channel.send(f"{support_role.mention} - New {ticket_type.lower()} ticket created!")
-
-        await interaction.followup.send(f"✅ Ticket created in {channel.mention}")
+            texts = []
+
+        async def post_intro():
+            # Sent one after another so the channel shows them in order
+            await channel.send(embed=embed)
+            for text in texts:
+                await channel.send(text)
+
+        # The confirmation is a different endpoint, so it doesn't wait on the channel posts.
+        # The channel exists by now, so a failed post is only logged; the except below is
+        # left for failures where the user got no confirmation.
+        intro, confirm = await asyncio.gather(
+            post_intro(),
+            interaction.followup.send(f"✅ Ticket created in {channel.mention}"),
+            return_exceptions=True,
+        )
+        if isinstance(intro, BaseException):
+            logger.error("Failed to post intro in ticket %s", channel.id, exc_info=intro)
+        if isinstance(confirm, BaseException):
+            raise confirm
     except Exception as e:
         logger.exception("Failed to create ticket: %s", e)
         await interaction.followup.send(f"❌ Failed to create ticket: {e}")
@@ -1354,11 +1997,18 @@ async def create_ticket(interaction: discord.Interaction, ticket_type: str, is_s
 # ---------- Cog registration ----------
 @bot.event
 async def setup_hook():
+    global _flusher_task, CABBIT
+
+    # Start the debounced JSON writer
+    _flusher_task = asyncio.create_task(_flusher())
+
     # Register persistent views with bot instance
     bot.add_view(TicketView(bot_instance=bot))
+    bot.add_view(_shared_menu(InterfaceMenuView))
 
     # Register cog and sync commands globally or to a guild
-    await bot.add_cog(Cabbit(bot))
+    CABBIT = Cabbit(bot)
+    await bot.add_cog(CABBIT)
     if TEST_GUILD_ID:
         bot.tree.copy_global_to(guild=discord.Object(id=int(TEST_GUILD_ID)))
         await bot.tree.sync(guild=discord.Object(id=int(TEST_GUILD_ID)))
@@ -1368,9 +2018,7 @@ async def setup_hook():
 
 @bot.event
 async def on_ready(*args, **kwargs):
-    GUILD_ID = 1441157308456632401
-    guild = discord.Object(id=GUILD_ID)
-    await bot.tree.sync(guild=guild)
+    # Commands are synced once in setup_hook; on_ready fires again on every reconnect
     logger.info(f"✅ Logged in as {bot.user} (ID: {bot.user.id})")
     await bot.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="over the server"))
 
@@ -1379,43 +2027,63 @@ async def on_ready(*args, **kwargs):
 async def on_member_join(member: discord.Member):
     # Send welcome message
     try:
-        cog = bot.get_cog("Cabbit")
-        guild_id = str(member.guild.id)
-        if guild_id in cog.welcome_channels:
-            ch = member.guild.get_channel(int(cog.welcome_channels[guild_id]))
-            if ch:
-                welcome_msg = f"🎉 Welcome {member.mention} to {member.guild.name}! Happy to have you here."
-                embed = discord.Embed(title="Welcome!", description=welcome_msg, color=discord.Color.green())
-                embed.set_thumbnail(url=member.display_avatar.url)
-                await ch.send(embed=embed)
+        ch = CABBIT._welcome_channel(member.guild)
+        if ch:
+            embed = _WELCOME_EMBED_TEMPLATE.copy()
+            embed.description = f"🎉 Welcome {member.mention} to {member.guild.name}! Happy to have you here."
+            embed.set_thumbnail(url=member.display_avatar.url)
+            await ch.send(embed=embed)
     except Exception as e:
         logger.exception("Welcome message failed: %s", e)
 
 
 @bot.event
 async def on_voice_state_update(member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
-    # Create personal VC when user joins a specific channel
+    # Mute/deafen/stream toggles keep the same channel; personal rooms only
+    # exist in guilds with an interface channel
+    if after.channel is before.channel:
+        return
+    interface_ch_id = CABBIT.vc_interface.get(member.guild.id)
+    if interface_ch_id is None:
+        return
+
     try:
-        if after.channel:
-            cog = bot.get_cog("Cabbit")
-            guild_id = str(member.guild.id)
-
-            # Check if user joined the interface channel
-            if guild_id in cog.vc_interface:
-                interface_ch_id = int(cog.vc_interface[guild_id])
-                if after.channel.id == interface_ch_id:
-                    await create_personal_vc(member, member.guild, cog)
+        # Delete a personal VC once its last member has left
+        if before.channel and before.channel.id in PERSONAL_VCS and not before.channel.members:
+            CABBIT._spawn(_delete_room_if_empty(before.channel))
+
+        # Create personal VC when user joins the interface channel
+        if after.channel and after.channel.id == interface_ch_id:
+            await create_personal_vc(member, member.guild, CABBIT)
     except Exception as e:
         logger.exception("Personal VC creation failed: %s", e)
 
 
+async def main():
+    # discord.py's default connector (unlimited pool), but idle TLS connections and DNS
+    # answers are kept longer so bursts of REST calls reuse them. The connector must be
+    # created inside the running loop.
+    bot.http.connector = aiohttp.TCPConnector(limit=0, ttl_dns_cache=300, keepalive_timeout=60)
+    try:
+        async with bot:
+            await bot.start(DISCORD_TOKEN)
+    finally:
+        # After the cog has unloaded, so its last saves are included
+        await close_json()
+
+
 if __name__ == "__main__":
     if not DISCORD_TOKEN:
         logger.error("❌ DISCORD_TOKEN environment variable is not set!")
         exit(1)
 
+    discord.utils.setup_logging(root=False)  # what bot.run did for the discord.* loggers
+
     try:
-        bot.run(DISCORD_TOKEN)
+        if HAS_UVLOOP:
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e: